@@ -1,6 +1,84 @@
+import functools
+import importlib.util
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 import numpy as np
 
+# numba is optional and only imported when a compiled kernel is first needed
+_HAVE_NUMBA = importlib.util.find_spec('numba') is not None
+prange = range  # swapped for numba.prange just before the kernels are compiled
+_COMPILED = {}
+
+
+def _jit(kernel):
+    """Returns the numba-compiled version of `kernel`, importing numba and compiling on first use."""
+    compiled = _COMPILED.get(kernel.__name__)
+    if compiled is None:
+        global prange
+        import numba
+        prange = numba.prange
+        compiled = _COMPILED[kernel.__name__] = numba.njit(parallel = True, cache = True)(kernel)
+    return compiled
+
+
+def _play_kernel(cumw_t, u, codes):
+    """Fills `codes` with the face indices for a (n_rolls, n_dice) matrix of uniforms, using row j of `cumw_t` for die j."""
+    n_rolls, n_dice = u.shape
+    for i in prange(n_rolls):
+        for j in range(n_dice):
+            codes[i, j] = np.searchsorted(cumw_t[j], u[i, j], side = 'right')
+    return codes
+
+
+def _face_counts_kernel(codes, n_faces):
+    """Counts each face code in each row of `codes`, one independent histogram per roll."""
+    n_rolls, n_dice = codes.shape
+    counts = np.zeros((n_rolls, n_faces), dtype = np.int64)
+    for r in prange(n_rolls):
+        for c in range(n_dice):
+            counts[r, codes[r, c]] += 1
+    return counts
+
+
+# shared by every Die and Game that is not given its own seed or Generator
+_DEFAULT_RNG = np.random.default_rng()
+
+# dice with at most this many faces are sampled by comparisons instead of a binary search,
+# once there are enough draws to amortize the extra NumPy calls (break-even measured near 1000)
+_SMALL_DIE_FACES = 4
+_SMALL_DIE_MIN_DRAWS = 1000
+
+
+def _lookup(cumw, u):
+    """Maps uniform draws in [0, 1) to face indices, unrolling the search into compares for tiny dice and many draws."""
+    if cumw.size > _SMALL_DIE_FACES or u.size < _SMALL_DIE_MIN_DRAWS:
+        return np.searchsorted(cumw, u, side = 'right')
+    # the index is the number of cumulative weights <= u; the last one is 1.0 and never counts
+    idx = (u >= cumw[0]).astype(np.intp)
+    for c in cumw[1:-1]:
+        idx += u >= c
+    return idx
+
+
+# below this many draws per play, thread start-up costs more than it saves
+_PARALLEL_MIN_DRAWS = 1_000_000
+
+# largest face-pair table the two-dice bincount path may allocate
+_PAIR_MAX_BINS = 1 << 20
+
+
+# Die.roll reuses its uniforms buffer up to this many rolls; larger rolls allocate per call
+_ROLL_BUF_MAX = 1 << 16
+
+
+def _fill_codes(out, cumw, seed):
+    """Fills one die's column of face indices from its own random stream."""
+    rng = np.random.default_rng(seed)
+    out[:] = _lookup(cumw, rng.random(out.size))
+
+
 class Die:
     """A class representing a single die with chosen N sides and W weights.
 
@@ -8,14 +86,17 @@ class Die:
 
     Attributes:
         faces (np.ndarray): A NumPy array of unique face values (must be strings or numbers)
-        weights (np.ndarray): A NumPy array of weights, defaulting to 1.0 for each face.
-        _df (pd.DataFrame): A private DataFrame storing faces and weights with faces as the index.
+        _weights (np.ndarray): A private NumPy array of weights, defaulting to 1.0 for each face.
+        _face_to_idx (dict): A private mapping from each face to its position in `faces`.
+        _sorted_faces (np.ndarray): The faces in sorted order.
+        _rng (np.random.Generator): The random generator used for rolling.
     """
-    def __init__(self, faces: np.ndarray):
+    def __init__(self, faces: np.ndarray, rng = None):
         """Initializes the Die object with the provided faces.
 
         Args:
             faces (np.ndarray): A NumPy array of unique face values (must be strings or numbers)
+            rng (int or np.random.Generator, optional): A seed or Generator passed to `np.random.default_rng`. Defaults to the module-level Generator.
 
         Raises:
             TypeError: If `faces` is not a NumPy array.
@@ -24,12 +105,23 @@ class Die:
         # to take care of the errors for this method
         if not isinstance(faces, np.ndarray):
             raise TypeError("Faces must be a NumPy array.")
-        if len(np.unique(faces)) != len(faces):
+        sorted_faces = np.unique(faces)
+        if sorted_faces.size != faces.size:
             raise ValueError("Faces must be unique.")
             
         self.faces  = faces    
-        self._df = pd.DataFrame({'face': faces, 'weight': [1.0] * len(faces)})
-        self._df.set_index('face', inplace=True)
+        self._faces = np.asarray(faces)
+        self._weights = np.ones(len(faces), dtype = np.float64)
+        self._face_to_idx = {f: i for i, f in enumerate(self._faces.tolist())}
+        self._sorted_faces = sorted_faces
+
+        # cached sampling state, rebuilt lazily after a weight changes
+        self._cumw_cache = None
+        self._dirty = True
+        self._show_df = None  # show_die() frame, rebuilt after a weight changes
+
+        self._rng = _DEFAULT_RNG if rng is None else np.random.default_rng(rng)
+        self._buf = np.empty(0)  # uniforms buffer, grown on demand up to _ROLL_BUF_MAX and reused across rolls
 
     def change_weight(self, face, new_weight):
         """Changes the weight of a single face on the die.
@@ -42,47 +134,72 @@ class Die:
             IndexError: If the face is not found in the die.
             TypeError: If the weight is not numeric or cannot be cast as numeric.
         """
-        if face not in self._df.index:
+        idx = self._face_to_idx.get(face)
+        if idx is None:
             raise IndexError(f"Face '{face}' is not in the die.")
         try:
             new_weight = float(new_weight)
         except (TypeError, ValueError):
             raise TypeError("New weight must be a numeric value (int or float).")
             
-        self._df.loc[face, 'weight'] = new_weight
+        self._weights[idx] = new_weight
+        self._dirty = True
+        self._show_df = None
+
+    @property
+    def _cumw(self):
+        """np.ndarray: Read-only normalized cumulative weights, rebuilt only after a weight changes.
+
+        Raises:
+            ValueError: If any weight is negative or not finite, or if all weights are zero.
+        """
+        if self._dirty:
+            if not np.isfinite(self._weights).all() or (self._weights < 0).any():
+                raise ValueError("Weights must be finite and non-negative.")
+            if self._weights.sum() == 0:
+                raise ValueError("At least one weight must be greater than zero.")
+            cumw = np.cumsum(self._weights)
+            cumw /= cumw[-1]
+            cumw.setflags(write = False)
+            self._cumw_cache = cumw
+            self._dirty = False
+        return self._cumw_cache
 
     def roll(self, num_rolls = 1):
         """Rolls the die one or more times using the current weights.
 
+        Rolls of up to `_ROLL_BUF_MAX` share a scratch buffer on the die, so one die should not be rolled from several threads at once.
+
         Args:
             num_rolls (int): Number of rolls to perform. Defaults to 1.
 
         Returns:
-            list: A list of face values rolled.
+            np.ndarray: An array of face values rolled.
         
         Raises:
-            ValueError: If `num_rolls` is not a positive integer.
+            ValueError: If `num_rolls` is not a positive integer, or if the weights are invalid (negative, not finite, or all zero).
         """
         if not isinstance(num_rolls, int) or num_rolls < 1:
             raise ValueError("Number of rolls must be a positive integer.")
             
-        results = list(
-            np.random.choice(
-                self._df.index,
-                size = num_rolls,
-                replace = True,
-                p = self._df['weight'] / self._df['weight'].sum()
-            )
-        )
-        return results
+        if num_rolls > _ROLL_BUF_MAX:
+            u = self._rng.random(num_rolls)
+        else:
+            if num_rolls > self._buf.size:
+                self._buf = np.empty(num_rolls)
+            u = self._rng.random(out = self._buf[:num_rolls])
+        # inverse-CDF sampling; side='right' never lands on a zero-weight face
+        return self._faces[_lookup(self._cumw, u)]
     
     def show_die(self):
         """Show the current faces and weights of the die.
 
         Returns:
-            pd.DataFrame: A copy of the internal dataframe with the faces and weights.
+            pd.DataFrame: A DataFrame of the weights with the faces as the index.
         """
-        return  self._df.copy()
+        if self._show_df is None:
+            self._show_df = pd.DataFrame({'weight': self._weights.copy()}, index = pd.Index(self._faces, name = 'face'))
+        return self._show_df.copy()
     
 class Game:
     """
@@ -94,14 +211,18 @@ class Game:
 
     Attributes:
         dice (list): A list of Die objects.
-        _results (pd.DataFrame): Results of the most recent play.
+        _faces (np.ndarray): The faces shared by all dice.
+        _codes (np.ndarray): Results of the most recent play as indices into `_faces`, one row per roll, in the narrowest unsigned dtype that fits.
+        _results (pd.DataFrame): Results of the most recent play as faces, built from `_codes` on first access.
+        _rng (np.random.Generator): The random generator used for playing.
     """
-    def __init__(self, dice_list: list):
+    def __init__(self, dice_list: list, rng = None):
         """
         Initialize the Game with a list of Die objects.
 
         Args:
             dice_list (list): List of Die objects.
+            rng (int or np.random.Generator, optional): A seed or Generator passed to `np.random.default_rng`. Defaults to the module-level Generator.
         
         Raises:
             TypeError: If any item in the list is not an instance of the Die class.
@@ -117,7 +238,33 @@ class Game:
                 raise ValueError("All dice must have the same set of faces.")
                 
         self.dice = dice_list
-        self._results = None
+        self._faces = dice_list[0]._faces
+        self._codes = None
+        self._code_dtype = np.min_scalar_type(max(self._faces.size - 1, 0))
+        self._rng = _DEFAULT_RNG if rng is None else np.random.default_rng(rng)
+
+        # wide results frame, built on first access and kept until the next play
+        self._results_df = None
+        self._results_codes = None
+
+        # stacked cumulative weights of all dice, reused across plays until a die's weights change
+        self._cumw_parts = ()
+        self._cumw = None
+        self._same_cumw = False
+
+    def _stacked_cumw(self):
+        """
+        Returns the dice's cumulative weights as one (n_dice, n_faces) matrix, re-stacking only if a die changed.
+
+        Returns:
+            tuple: The stacked matrix and whether every die has the same weights.
+        """
+        parts = tuple(d._cumw for d in self.dice)
+        if len(parts) != len(self._cumw_parts) or any(a is not b for a, b in zip(parts, self._cumw_parts)):
+            self._cumw_parts = parts
+            self._cumw = np.stack(parts)
+            self._same_cumw = bool((self._cumw == self._cumw[0]).all())
+        return self._cumw, self._same_cumw
 
     def play(self, num_rolls: int):
         """
@@ -127,18 +274,51 @@ class Game:
             n_rolls (int): Number of times to roll the dice.
             
         Raises:
-            ValueError: If `num_rolls` is not a positive integer.
+            ValueError: If `num_rolls` is not a positive integer, or if any die has invalid weights (negative, not finite, or all zero).
         """
         
         if not isinstance(num_rolls, int) or num_rolls < 1:
             raise ValueError("Number of rolls must be a positive integer.")
 
-        roll_data = {}
-        for i, die in enumerate(self.dice):
-            roll_data[i] = die.roll(num_rolls)
-
-        self._results = pd.DataFrame(roll_data)
-        self._results.index.name = "roll number"
+        # all dice share the same faces, so draw every die at once as face indices
+        cumw, same_cumw = self._stacked_cumw()
+        n_dice = len(self.dice)
+
+        large = num_rolls * n_dice >= _PARALLEL_MIN_DRAWS
+        if _HAVE_NUMBA and large and cumw.shape[1] > _SMALL_DIE_FACES:
+            # compiled loop over rolls, parallel across cores; tiny dice are faster with the unrolled compares below
+            codes = np.empty((num_rolls, n_dice), dtype = self._code_dtype)
+            self._codes = _jit(_play_kernel)(cumw, self._rng.random((num_rolls, n_dice)), codes)
+            return
+
+        if n_dice > 1 and large:
+            # one thread and one independent stream per die; NumPy releases the GIL while sampling
+            codes = np.empty((num_rolls, n_dice), dtype = self._code_dtype, order = 'F')
+            seeds = np.random.SeedSequence(self._rng.integers(np.iinfo(np.int64).max)).spawn(n_dice)
+            with ThreadPoolExecutor(max_workers = min(n_dice, os.cpu_count() or 1)) as pool:
+                list(pool.map(_fill_codes, codes.T, cumw, seeds))
+            self._codes = codes
+            return
+
+        u = self._rng.random((num_rolls, n_dice))
+        if same_cumw:
+            codes = _lookup(cumw[0], u).astype(self._code_dtype)
+        else:
+            codes = np.empty(u.shape, dtype = self._code_dtype)
+            for j in range(n_dice):
+                codes[:, j] = _lookup(cumw[j], u[:, j])
+
+        self._codes = codes
+
+    @property
+    def _results(self):
+        """pd.DataFrame: The wide results of the most recent play, or None if no play has occurred yet."""
+        if self._codes is None:
+            return None
+        if self._results_codes is not self._codes:
+            self._results_df = self.show('wide')
+            self._results_codes = self._codes
+        return self._results_df
 
     def show(self, form: str = "wide"):
         """
@@ -155,19 +335,41 @@ class Game:
         Raises:
             ValueError: If the `form` argument is not 'wide' or 'narrow'.
         """
-        if self._results is None:
+        if self._codes is None:
             return pd.DataFrame()  # No play has occurred yet
 
+        n_rolls, n_dice = self._codes.shape
         if form == "wide":
-            return self._results.copy()
+            # the gathered matrix is freshly allocated, so let pandas wrap it as one block without copying
+            results = pd.DataFrame(self._faces[self._codes], columns = range(n_dice), copy = False)
+            results.index.name = "roll number"
+            return results
         elif form == "narrow":
-            return self._results.reset_index().melt(id_vars=["roll number"],
-                                                         var_name="die number",
-                                                         value_name="face")
+            # same row order as melting the wide frame: all rolls of die 0, then die 1, ...
+            return pd.DataFrame({"roll number": np.tile(np.arange(n_rolls), n_dice),
+                                 "die number": np.repeat(np.arange(n_dice), n_rolls),
+                                 "face": self._faces[self._codes.T.ravel()]})
         else:
             raise ValueError("form must be either 'wide' or 'narrow'")
             
             
+# marks an Analyzer that has not loaded any game results yet; unlike None it never matches Game._codes
+_UNSYNCED = object()
+
+
+def _memoized(method):
+    """Caches an Analyzer method's result until its game is played again."""
+    @functools.wraps(method)
+    def wrapper(self):
+        self._sync()
+        if method.__name__ not in self._cache:
+            self._cache[method.__name__] = method(self)
+        result = self._cache[method.__name__]
+        # hand out copies so callers cannot modify the cached frame
+        return result.copy() if isinstance(result, pd.DataFrame) else result
+    return wrapper
+
+
 class Analyzer:
     """
     An Analyzer takes the results of a single Game and computes different descriptive statistical analysis.
@@ -193,8 +395,66 @@ class Analyzer:
             raise ValueError("The input must be a Game object.")
         
         self.game = game
-        self.results = game.show('wide')
-        
+        self._sorted_faces = game.dice[0]._sorted_faces
+        self._game_codes = _UNSYNCED
+        self._cache = {}
+        self._sync()
+
+    @property
+    def results(self):
+        """pd.DataFrame: The results of the game's last play (each row is a roll), decoded by the game once per play."""
+        results = self.game._results
+        return pd.DataFrame() if results is None else results
+
+    def _sync(self):
+        """
+        Reloads the game's results and clears cached outputs if the game was played since the last load
+        """
+        if self._game_codes is self.game._codes:
+            return
+        self._game_codes = self.game._codes
+        self._cache = {}
+
+        # re-code the game's face indices against the sorted faces, so code order matches face order
+        rank = np.searchsorted(self._sorted_faces, self.game._faces).astype(self.game._code_dtype)
+        if self._game_codes is None:
+            self._codes = np.empty((0, len(self.game.dice)), dtype = self.game._code_dtype)
+        else:
+            self._codes = rank[self._game_codes]
+
+    def _count_rows(self, codes):
+        """
+        Counts the distinct rows of a code matrix, in sorted order
+
+        Parameters:
+            codes (np.ndarray): A 2-D array of face codes, one row per roll.
+
+        Returns:
+            pd.DataFrame: DataFrame indexed by the distinct rows (as faces) with a 'count' column.
+        """
+        n_faces = self._sorted_faces.size
+        n_dice = codes.shape[1]
+        bits = max(n_faces - 1, 1).bit_length()
+        if n_dice == 2 and n_faces * n_faces <= _PAIR_MAX_BINS:
+            # two dice: each row is one bin of an n_faces x n_faces table
+            pair_counts = np.bincount(codes[:, 0].astype(np.intp) * n_faces + codes[:, 1], minlength = n_faces * n_faces)
+            keys = np.flatnonzero(pair_counts)
+            uniq = np.stack([keys // n_faces, keys % n_faces], axis = 1)
+            counts = pair_counts[keys]
+        elif n_dice * bits <= 64:
+            # pack each row into one uint64, first die in the high bits so key order is row order
+            packed = np.zeros(codes.shape[0], dtype = np.uint64)
+            for j in range(n_dice):
+                packed = (packed << np.uint64(bits)) | codes[:, j].astype(np.uint64)
+            keys, counts = np.unique(packed, return_counts = True)
+            mask = np.uint64((1 << bits) - 1)
+            uniq = np.stack([(keys >> np.uint64(bits * (n_dice - 1 - j))) & mask for j in range(n_dice)], axis = 1).astype(np.intp)
+        else:
+            uniq, counts = np.unique(codes, axis = 0, return_counts = True)
+        rows = self._sorted_faces[uniq]
+        return pd.DataFrame({'count': counts}, index = pd.MultiIndex.from_arrays(list(rows.T)))
+
+    @_memoized
     def jackpot(self):
         """
         Count how many times all dice in a roll showed the same face
@@ -202,9 +462,10 @@ class Analyzer:
         Returns:
             int: # of jackpots
         """
-        jackpots = self.results.nunique(axis = 1) == 1
-        return jackpots.sum()
+        jackpots = (self._codes == self._codes[:, :1]).all(axis = 1)
+        return int(jackpots.sum())
 
+    @_memoized
     def face_counts_per_roll(self):
         """
         Counts how many times each face appeared in each roll
@@ -212,10 +473,20 @@ class Analyzer:
         Returns:
             pd.DataFrame: A DataFrame with roll number as index, face values as columns, and the count of each face per roll as values
         """
-        face_counts = self.results.apply(pd.Series.value_counts, axis = 1).fillna(0).astype(int)
-        face_counts.index.name = "roll number"
+        n_rolls = self._codes.shape[0]
+        n_faces = self._sorted_faces.size
+        if _HAVE_NUMBA and self._codes.size >= _PARALLEL_MIN_DRAWS:
+            # compiled per-roll histograms only pay off once they can be spread across cores
+            counts = _jit(_face_counts_kernel)(self._codes, n_faces)
+        else:
+            # one histogram over (roll, face) bins instead of an unbuffered np.add.at scatter
+            flat = (np.arange(n_rolls, dtype = np.intp)[:, None] * n_faces + self._codes).ravel()
+            counts = np.bincount(flat, minlength = n_rolls * n_faces).reshape(n_rolls, n_faces)
+
+        face_counts = pd.DataFrame(counts, index = pd.RangeIndex(n_rolls, name = "roll number"), columns = self._sorted_faces)
         return face_counts
 
+    @_memoized
     def combo(self):
         """
         Counts the distinct combinations of faces rolled, along with their counts
@@ -225,12 +496,9 @@ class Analyzer:
         Returns:
             pd.DataFrame: Dataframe of unique combos and their counts.
         """
-        sorted_results = self.results.apply(lambda row: tuple(sorted(row)), axis=1)
-        combos = sorted_results.value_counts().sort_index()
-        combo_df = combos.to_frame(name='count')
-        combo_df.index = pd.MultiIndex.from_tuples(combo_df.index)
-        return combo_df
+        return self._count_rows(np.sort(self._codes, axis = 1))
 
+    @_memoized
     def permutation(self):
         """
         Counts the distinct permutations of faces rolled (order matters), along with count
@@ -238,7 +506,4 @@ class Analyzer:
         Returns:
             pd.DataFrame: DataFrame indexed by permutation with 'count' column.
         """
-        perms = self.results.apply(lambda row: tuple(row), axis=1).value_counts().sort_index()
-        perm_df = perms.to_frame(name='count')
-        perm_df.index = pd.MultiIndex.from_tuples(perm_df.index)
-        return perm_df
\ No newline at end of file
+        return self._count_rows(self._codes)
\ No newline at end of file
@@ -8,5 +8,6 @@ setup(
     author='Shriya Kuruba',
     author_email='ewu9af@viriginia.edu',   
     description='his package simulates a game involving dice with customizable weights.',
-    license='MIT'
+    license='MIT',
+    extras_require={'numba': ['numba']}
 )
@@ -1,7 +1,10 @@
 import unittest
+from unittest import mock
+
 import numpy as np
 import pandas as pd
 
+from montecarlo import montecarlo
 from montecarlo.montecarlo import Die, Game, Analyzer
 
 class TestDie(unittest.TestCase):
@@ -23,17 +26,17 @@ class TestDie(unittest.TestCase):
 
     def test_init_(self):
         """
-        Test that the Die object creates an internal DataFrame with proper structure.
+        Test that the Die object creates internal weight arrays with proper structure.
         """
-        self.assertIsInstance(self.die._df, pd.DataFrame)
-        self.assertListEqual(sorted(self.die._df.columns.tolist()), ['weight'])
+        self.assertIsInstance(self.die._weights, np.ndarray)
+        self.assertListEqual(self.die._weights.tolist(), [1.0, 1.0, 1.0])
 
     def test_change_weight(self):
         """
         Test that change_weight correctly modifies the weight of a face.
         """
         self.die.change_weight(2, 5.0)
-        self.assertEqual(self.die._df.loc[2, 'weight'], 5.0)
+        self.assertEqual(self.die.show_die().loc[2, 'weight'], 5.0)
         
     def test_change_weight_invalid_face(self):
         """
@@ -47,9 +50,71 @@ class TestDie(unittest.TestCase):
         Test that roll returns a NumPy array of the correct length.
         """
         result = self.die.roll(5)
-        self.assertIsInstance(result, list)
+        self.assertIsInstance(result, np.ndarray)
         self.assertEqual(len(result), 5)
 
+    def test_lookup_matches_searchsorted(self):
+        """
+        Test that the small-die lookup picks the same faces as a binary search on both sides of the draw-count gate.
+        """
+        cumw = np.cumsum([1.0, 0.0, 2.0, 1.0])
+        cumw /= cumw[-1]
+        for n in (1, montecarlo._SMALL_DIE_MIN_DRAWS - 1, montecarlo._SMALL_DIE_MIN_DRAWS, 5000):
+            u = np.random.random(n)
+            np.testing.assert_array_equal(montecarlo._lookup(cumw, u), np.searchsorted(cumw, u, side='right'))
+
+    def test_roll_negative_weight(self):
+        """
+        Test that roll raises ValueError when a weight is negative.
+        """
+        self.die.change_weight(2, -5)
+        with self.assertRaises(ValueError):
+            self.die.roll(5)
+
+    def test_roll_nan_weight(self):
+        """
+        Test that roll raises ValueError when a weight is NaN.
+        """
+        self.die.change_weight(2, float('nan'))
+        with self.assertRaises(ValueError):
+            self.die.roll(5)
+
+    def test_roll_all_zero_weights(self):
+        """
+        Test that roll raises ValueError when every weight is zero.
+        """
+        for face in self.faces:
+            self.die.change_weight(face, 0)
+        with self.assertRaises(ValueError):
+            self.die.roll(5)
+
+    def test_roll_seeded(self):
+        """
+        Test that dice built with the same seed roll the same faces.
+        """
+        a = Die(self.faces, rng=42).roll(10)
+        b = Die(self.faces, rng=42).roll(10)
+        np.testing.assert_array_equal(a, b)
+
+    def test_roll_buffer_capped(self):
+        """
+        Test that a roll larger than the buffer cap does not grow the die's buffer.
+        """
+        with mock.patch.object(montecarlo, '_ROLL_BUF_MAX', 8):
+            self.die.roll(5)
+            result = self.die.roll(50)
+        self.assertEqual(len(result), 50)
+        self.assertEqual(self.die._buf.size, 5)
+
+    def test_roll_uses_changed_weights(self):
+        """
+        Test that roll only returns faces with non-zero weight after change_weight.
+        """
+        self.die.change_weight(1, 0)
+        self.die.change_weight(3, 0)
+        result = self.die.roll(20)
+        self.assertTrue((result == 2).all())
+
     def test_show_die(self):
         """
         Test that show returns a DataFrame with 'face' and 'weight' columns.
@@ -59,6 +124,16 @@ class TestDie(unittest.TestCase):
         self.assertListEqual(sorted(df.columns.tolist()), ['weight'])
         self.assertTrue(df.index.is_unique)
 
+    def test_show_die_after_change(self):
+        """
+        Test that show_die reflects later weight changes and that edits to its result do not leak back.
+        """
+        df = self.die.show_die()
+        df.loc[1, 'weight'] = 9.0
+        self.assertEqual(self.die.show_die().loc[1, 'weight'], 1.0)
+        self.die.change_weight(1, 4.0)
+        self.assertEqual(self.die.show_die().loc[1, 'weight'], 4.0)
+
 
 class TestGame(unittest.TestCase):
     """
@@ -78,11 +153,95 @@ class TestGame(unittest.TestCase):
 
     def test_play(self):
         """
-        Test that the play method creates a result DataFrame with correct shape.
+        Test that the play method stores a results matrix with correct shape.
+        """
+        self.game.play(10)
+        codes = self.game._codes
+        self.assertEqual(codes.shape, (10, 2))  # 10 rolls, 2 dice
+        self.assertEqual(self.game._results.shape, (10, 2))
+        self.assertEqual(codes.dtype, np.uint8)
+
+    def test_results_built_once_per_play(self):
+        """
+        Test that _results is decoded once per play and shared with an Analyzer of the game.
+        """
+        self.game.play(5)
+        results = self.game._results
+        self.assertIs(self.game._results, results)
+        self.assertIs(Analyzer(self.game).results, results)
+        self.game.play(5)
+        self.assertIsNot(self.game._results, results)
+
+    def test_play_seeded(self):
+        """
+        Test that games built with the same seed play the same results.
+        """
+        results = []
+        for _ in range(2):
+            game = Game(self.game.dice, rng=7)
+            game.play(10)
+            results.append(game.show('wide'))
+        pd.testing.assert_frame_equal(results[0], results[1])
+
+    def test_play_all_zero_weights(self):
+        """
+        Test that play raises ValueError when a die has all-zero weights.
+        """
+        self.game.dice[1].change_weight('H', 0)
+        self.game.dice[1].change_weight('T', 0)
+        with self.assertRaises(ValueError):
+            self.game.play(5)
+
+    def test_play_uses_each_die_weights(self):
         """
+        Test that play rolls each die with its own weights.
+        """
+        self.game.dice[0].change_weight('T', 0)
+        self.game.dice[1].change_weight('H', 0)
         self.game.play(10)
-        df = self.game._results
-        self.assertEqual(df.shape, (10, 2))  # 10 rolls, 2 dice
+        df = self.game.show('wide')
+        self.assertTrue((df[0] == 'H').all())
+        self.assertTrue((df[1] == 'T').all())
+
+    @unittest.skipIf(not montecarlo._HAVE_NUMBA, "numba is not installed")
+    def test_play_compiled(self):
+        """
+        Test that the compiled path of play, used for large games of bigger dice, respects weights.
+        """
+        faces = np.arange(6)
+        dice = [Die(faces) for _ in range(2)]
+        for face in faces[1:]:
+            dice[1].change_weight(face, 0)
+        game = Game(dice)
+        with mock.patch.object(montecarlo, '_PARALLEL_MIN_DRAWS', 1):
+            game.play(10)
+        df = game.show('wide')
+        self.assertEqual(df.shape, (10, 2))
+        self.assertTrue((df[1] == 0).all())
+
+    def test_play_reuses_cumulative_weights(self):
+        """
+        Test that play keeps the stacked cumulative weights until a die's weights change.
+        """
+        self.game.play(5)
+        stacked = self.game._cumw
+        self.game.play(5)
+        self.assertIs(self.game._cumw, stacked)
+        self.game.dice[0].change_weight('H', 3)
+        self.game.play(5)
+        self.assertIsNot(self.game._cumw, stacked)
+        self.assertAlmostEqual(self.game._cumw[0, 0], 0.75)
+
+    def test_play_parallel(self):
+        """
+        Test that the threaded path of play gives the same shape and respects weights.
+        """
+        self.game.dice[1].change_weight('H', 0)
+        with mock.patch.object(montecarlo, '_PARALLEL_MIN_DRAWS', 1):
+            self.game.play(10)
+        df = self.game.show('wide')
+        self.assertEqual(df.shape, (10, 2))
+        self.assertTrue((df[1] == 'T').all())
 
     def test_show_wide_format(self):
         """
@@ -102,6 +261,17 @@ class TestGame(unittest.TestCase):
         self.assertIsInstance(result, pd.DataFrame)
         self.assertEqual(set(result.columns), {'roll number', 'die number', 'face'})
 
+    def test_show_narrow_matches_wide(self):
+        """
+        Test that show('narrow') holds the same faces as show('wide'), one row per die per roll.
+        """
+        self.game.play(4)
+        wide = self.game.show('wide')
+        narrow = self.game.show('narrow')
+        self.assertEqual(len(narrow), 8)
+        for _, row in narrow.iterrows():
+            self.assertEqual(wide.loc[row['roll number'], row['die number']], row['face'])
+
 
 class TestAnalyzer(unittest.TestCase):
     """
@@ -129,6 +299,55 @@ class TestAnalyzer(unittest.TestCase):
         result = self.analyzer.jackpot()
         self.assertTrue(isinstance(result, (int, np.integer)))
 
+    def test_jackpot_count(self):
+        """
+        Test that jackpot counts every roll when all dice can only land on one face.
+        """
+        for die in self.game.dice:
+            die.change_weight(1, 0)
+            die.change_weight(2, 0)
+        self.game.play(15)
+        self.assertEqual(Analyzer(self.game).jackpot(), 15)
+
+    def test_results_cached_until_replay(self):
+        """
+        Test that repeated calls reuse cached results and a new play refreshes them.
+        """
+        first = self.analyzer.face_counts_per_roll()
+        self.assertIn('face_counts_per_roll', self.analyzer._cache)
+        first.iloc[0, 0] = -1  # callers get a copy, not the cached frame
+        self.assertTrue((self.analyzer.face_counts_per_roll() >= 0).all().all())
+        self.game.play(7)
+        self.assertEqual(self.analyzer.face_counts_per_roll().shape[0], 7)
+        self.assertEqual(self.analyzer.results.shape[0], 7)
+
+    def test_face_counts_per_roll_branches_agree(self):
+        """
+        Test that the compiled and bincount paths of face_counts_per_roll give equal counts.
+        """
+        with mock.patch.object(montecarlo, '_PARALLEL_MIN_DRAWS', 1):
+            compiled = Analyzer(self.game).face_counts_per_roll()
+        with mock.patch.object(montecarlo, '_HAVE_NUMBA', False):
+            plain = Analyzer(self.game).face_counts_per_roll()
+        pd.testing.assert_frame_equal(compiled, plain)
+
+    def test_results_follow_replay(self):
+        """
+        Test that results reflect a new play without calling any analysis method first.
+        """
+        self.game.play(9)
+        self.assertEqual(self.analyzer.results.shape[0], 9)
+
+    def test_unplayed_game_is_cached(self):
+        """
+        Test that an Analyzer of an unplayed game keeps its cache between calls.
+        """
+        analyzer = Analyzer(Game([Die(np.array([1, 2]))]))
+        self.assertEqual(analyzer.jackpot(), 0)
+        self.assertIn('jackpot', analyzer._cache)
+        self.assertTrue(analyzer.results.empty)
+        self.assertIn('jackpot', analyzer._cache)
+
     def test_face_counts_per_roll_structure(self):
         """
         Test that face_counts_per_roll returns a DataFrame with roll count rows.
@@ -137,6 +356,14 @@ class TestAnalyzer(unittest.TestCase):
         self.assertIsInstance(df, pd.DataFrame)
         self.assertEqual(df.shape[0], 20)
 
+    def test_face_counts_per_roll_values(self):
+        """
+        Test that each row of face_counts_per_roll sums to the number of dice.
+        """
+        df = self.analyzer.face_counts_per_roll()
+        self.assertListEqual(df.columns.tolist(), [1, 2, 3])
+        self.assertTrue((df.sum(axis=1) == 3).all())
+
     def test_combo_returns_dataframe(self):
         """
         Test that combo returns a DataFrame with combinations and counts.
@@ -145,6 +372,45 @@ class TestAnalyzer(unittest.TestCase):
         self.assertIsInstance(combo_df, pd.DataFrame)
         self.assertIn('count', combo_df.columns)
 
+    def test_combo_counts(self):
+        """
+        Test that combo counts add up to the number of rolls and each combo is sorted.
+        """
+        combo_df = self.analyzer.combo()
+        self.assertEqual(combo_df['count'].sum(), 20)
+        self.assertTrue(all(list(c) == sorted(c) for c in combo_df.index))
+
+    def test_two_dice_counts(self):
+        """
+        Test that combo and permutation counts for a two-dice game match the game results.
+        """
+        game = Game([Die(np.array(['a', 'b', 'c'])) for _ in range(2)])
+        game.play(30)
+        analyzer = Analyzer(game)
+        rows = game.show('wide').apply(tuple, axis=1)
+        perm_df = analyzer.permutation()
+        for perm, count in rows.value_counts().items():
+            self.assertEqual(perm_df.loc[perm, 'count'], count)
+        combo_df = analyzer.combo()
+        for combo, count in rows.map(lambda r: tuple(sorted(r))).value_counts().items():
+            self.assertEqual(combo_df.loc[combo, 'count'], count)
+        self.assertEqual(len(combo_df), len(set(rows.map(lambda r: tuple(sorted(r))))))
+
+    def test_wide_game_counts(self):
+        """
+        Test that permutation counts are right whether or not rows fit in a packed 64-bit key.
+        """
+        faces = np.arange(20)
+        for n_dice in (4, 14):  # 4 x 5 bits fits in 64, 14 x 5 does not
+            game = Game([Die(faces) for _ in range(n_dice)])
+            game.play(25)
+            perm_df = Analyzer(game).permutation()
+            expected = game.show('wide').apply(tuple, axis=1).value_counts()
+            self.assertEqual(len(perm_df), len(expected))
+            for perm, count in expected.items():
+                self.assertEqual(perm_df.loc[perm, 'count'], count)
+            self.assertTrue(perm_df.index.is_monotonic_increasing)
+
     def test_permutation_returns_dataframe(self):
         """
         Test that permutation returns a DataFrame with permutations and counts.
@@ -153,6 +419,16 @@ class TestAnalyzer(unittest.TestCase):
         self.assertIsInstance(perm_df, pd.DataFrame)
         self.assertIn('count', perm_df.columns)
 
+    def test_permutation_counts(self):
+        """
+        Test that permutation counts match the rows of the game results.
+        """
+        perm_df = self.analyzer.permutation()
+        expected = self.game.show('wide').apply(tuple, axis=1).value_counts()
+        self.assertEqual(perm_df['count'].sum(), 20)
+        for perm, count in expected.items():
+            self.assertEqual(perm_df.loc[perm, 'count'], count)
+
 
 if __name__ == '__main__':
     unittest.main()